@@ -1,16 +1,30 @@
 #!/usr/bin/env python3
-import json
 import os
 import sys
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional
 import argparse
-from collections import defaultdict
+import functools
+import gzip
+from concurrent.futures import ThreadPoolExecutor
+
+import orjson
+
+# Report fields the summary reads; anything else in a report is dropped on load
+_REPORT_FIELDS = frozenset(("order_id", "order_number", "flow_start", "flow_end", "total_duration", "success", "steps"))
+
+@functools.lru_cache(maxsize=4096)
+def _iso_ts(value: str) -> float:
+    """Convert an ISO timestamp string to a POSIX timestamp, caching repeats."""
+    return datetime.fromisoformat(value).timestamp()
 
 class TimingSummary:
     def __init__(self, reports_dir: str):
         self.reports_dir = Path(reports_dir)
+        # A JSONL file written with --aggregate-reports holds a whole batch, named after it
+        self.is_jsonl = self.reports_dir.suffix == ".jsonl"
+        self.batch_id = self.reports_dir.stem if self.is_jsonl else self.reports_dir.name
         self.timing_data = []
         self.summary = {
             "total_orders": 0,
@@ -20,17 +34,55 @@ class TimingSummary:
             "average_duration": 0,
             "min_duration": float('inf'),
             "max_duration": 0,
-            "step_metrics": defaultdict(lambda: {
-                "total_duration": 0,
-                "average_duration": 0,
-                "min_duration": float('inf'),
-                "max_duration": 0,
-                "count": 0
-            }),
+            "step_metrics": {},
             "batch_metrics": [],
             "orders": []
         }
 
+    @staticmethod
+    def _parse_report(raw: bytes) -> Dict:
+        """Parse one report, keeping only the fields the summary reads."""
+        data = orjson.loads(raw)
+        report = {key: value for key, value in data.items() if key in _REPORT_FIELDS}
+
+        # Coerce durations to float once here so aggregation can use them as-is
+        total_duration = report.get("total_duration", 0.0)
+        report["total_duration"] = total_duration if isinstance(total_duration, float) else float(total_duration)
+        for step_data in report.get("steps", {}).values():
+            duration = step_data.get("duration", 0.0)
+            step_data["duration"] = duration if isinstance(duration, float) else float(duration)
+        return report
+
+    @classmethod
+    def _load_one(cls, report_file: str) -> Optional[Dict]:
+        """Read and parse a single report file, returning None if it can't be loaded."""
+        try:
+            with open(report_file, 'rb') as f:
+                return cls._parse_report(f.read())
+        except Exception as e:
+            print(f"Error loading {report_file}: {e}")
+            return None
+
+    def _load_jsonl(self):
+        """Parse every report line of an aggregated JSONL file in one read."""
+        with open(self.reports_dir, 'rb') as f:
+            lines = [line for line in f.read().splitlines() if line.strip()]
+        sources = []
+        loaded = []
+        for line_number, line in enumerate(lines, 1):
+            source = f"{self.reports_dir} line {line_number}"
+            try:
+                report = self._parse_report(line)
+            except Exception as e:
+                print(f"Error loading {source}: {e}")
+                continue
+            # The batch's own timing record has no order ID, like order_None files
+            if report.get("order_id") is None and report.get("order_number") is None:
+                continue
+            sources.append(source)
+            loaded.append(report)
+        return sources, loaded
+
     def load_timing_data(self):
         """Load timing data from all report files in the directory."""
         if not self.reports_dir.exists():
@@ -38,8 +90,9 @@ class TimingSummary:
             return
 
         batch_info = {
-            "batch_id": self.reports_dir.name,
+            "batch_id": self.batch_id,
             "start_time": None,
+            "start_time_str": None,
             "end_time": None,
             "total_duration": 0,
             "order_count": 0,
@@ -48,33 +101,55 @@ class TimingSummary:
             "orders": []
         }
 
-        # Load individual order reports
-        for report_file in self.reports_dir.glob("order_*.json"):
-            if "None" in report_file.name:
+        if self.is_jsonl:
+            report_files, loaded = self._load_jsonl()
+        else:
+            # Load individual order reports, overlapping file reads across threads
+            with os.scandir(self.reports_dir) as entries:
+                report_files = [
+                    entry.path for entry in entries
+                    if entry.is_file()
+                    and entry.name.startswith("order_")
+                    and entry.name.endswith(".json")
+                    and "None" not in entry.name
+                ]
+            max_workers = min(32, (os.cpu_count() or 1) * 4)
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                loaded = list(executor.map(self._load_one, report_files))
+
+        for report_file, data in zip(report_files, loaded):
+            if data is None:
                 continue
 
             try:
-                with open(report_file, 'r') as f:
-                    data = json.load(f)
-                    self.timing_data.append(data)
-                    batch_info["orders"].append(data)
-
-                    # Update batch metrics
-                    batch_info["order_count"] += 1
-                    if data.get("success", True):
-                        batch_info["successful_orders"] += 1
-                    else:
-                        batch_info["failed_orders"] += 1
-
-                    # Parse timestamps
-                    start_time = datetime.fromisoformat(data["flow_start"]).timestamp()
-                    end_time = datetime.fromisoformat(data["flow_end"]).timestamp()
-                    
-                    # Update batch timing
-                    if not batch_info["start_time"] or start_time < batch_info["start_time"]:
-                        batch_info["start_time"] = start_time
-                    if not batch_info["end_time"] or end_time > batch_info["end_time"]:
-                        batch_info["end_time"] = end_time
+                self.timing_data.append(data)
+
+                # Update batch metrics
+                batch_info["order_count"] += 1
+                if data.get("success", True):
+                    batch_info["successful_orders"] += 1
+                else:
+                    batch_info["failed_orders"] += 1
+
+                # Parse timestamps
+                start_time = _iso_ts(data["flow_start"])
+                end_time = _iso_ts(data["flow_end"])
+                
+                # Update batch timing
+                if not batch_info["start_time"] or start_time < batch_info["start_time"]:
+                    batch_info["start_time"] = start_time
+                if not batch_info["end_time"] or end_time > batch_info["end_time"]:
+                    batch_info["end_time"] = end_time
+
+                # Keep a compact per-order record rather than the full report
+                order_summary = {
+                    "id": data.get("order_id"),
+                    "start": start_time,
+                    "duration": data["total_duration"],
+                    "success": data.get("success", True)
+                }
+                batch_info["orders"].append(order_summary)
+                self.summary["orders"].append(order_summary)
 
             except Exception as e:
                 print(f"Error loading {report_file}: {e}")
@@ -82,6 +157,8 @@ class TimingSummary:
         # Calculate batch duration
         if batch_info["start_time"] and batch_info["end_time"]:
             batch_info["total_duration"] = batch_info["end_time"] - batch_info["start_time"]
+        if batch_info["start_time"]:
+            batch_info["start_time_str"] = datetime.fromtimestamp(batch_info["start_time"]).strftime("%H:%M:%S")
 
         if batch_info["order_count"] > 0:
             self.summary["batch_metrics"].append(batch_info)
@@ -97,108 +174,150 @@ class TimingSummary:
         if not self.timing_data:
             return
 
-        self.summary["total_orders"] = len(self.timing_data)
-        self.summary["successful_orders"] = sum(1 for data in self.timing_data if data.get("success", True))
-        self.summary["failed_orders"] = self.summary["total_orders"] - self.summary["successful_orders"]
+        total_orders = 0
+        successful_orders = 0
+        total_duration = 0.0
+        min_duration = float('inf')
+        max_duration = 0.0
 
-        # Calculate overall timing metrics
-        durations = [float(data.get("total_duration", 0)) for data in self.timing_data]
-        if durations:
-            self.summary["total_duration"] = sum(durations)
-            self.summary["average_duration"] = self.summary["total_duration"] / len(durations)
-            self.summary["min_duration"] = min(durations)
-            self.summary["max_duration"] = max(durations)
+        # Per-step accumulators live in parallel lists indexed by the order in
+        # which step names are first seen, so the inner loop does one dict
+        # lookup per step instead of several keyed updates
+        step_index = {}
+        step_totals = []
+        step_counts = []
+        step_mins = []
+        step_maxs = []
 
-        # Calculate step metrics
+        # Aggregate order and step metrics in a single pass
         for data in self.timing_data:
-            steps = data.get("steps", {})
-            for step_name, step_data in steps.items():
-                duration = float(step_data.get("duration", 0))
-                metrics = self.summary["step_metrics"][step_name]
-                
-                metrics["total_duration"] += duration
-                metrics["count"] += 1
-                metrics["min_duration"] = min(metrics["min_duration"], duration)
-                metrics["max_duration"] = max(metrics["max_duration"], duration)
+            total_orders += 1
+            if data.get("success", True):
+                successful_orders += 1
+
+            duration = data["total_duration"]
+            total_duration += duration
+            if duration < min_duration:
+                min_duration = duration
+            if duration > max_duration:
+                max_duration = duration
+
+            for step_name, step_data in data.get("steps", {}).items():
+                step_duration = step_data["duration"]
+                i = step_index.get(step_name)
+                if i is None:
+                    i = step_index[step_name] = len(step_totals)
+                    step_totals.append(0.0)
+                    step_counts.append(0)
+                    step_mins.append(float('inf'))
+                    step_maxs.append(0.0)
+
+                step_totals[i] += step_duration
+                step_counts[i] += 1
+                if step_duration < step_mins[i]:
+                    step_mins[i] = step_duration
+                if step_duration > step_maxs[i]:
+                    step_maxs[i] = step_duration
 
-        # Calculate averages for each step
-        for metrics in self.summary["step_metrics"].values():
-            if metrics["count"] > 0:
-                metrics["average_duration"] = metrics["total_duration"] / metrics["count"]
+        self.summary["total_orders"] = total_orders
+        self.summary["successful_orders"] = successful_orders
+        self.summary["failed_orders"] = total_orders - successful_orders
+        self.summary["total_duration"] = total_duration
+        self.summary["average_duration"] = total_duration / total_orders
+        self.summary["min_duration"] = min_duration
+        self.summary["max_duration"] = max_duration
+
+        # Build per-step metrics, including averages
+        step_metrics = self.summary["step_metrics"]
+        for step_name, i in step_index.items():
+            step_metrics[step_name] = {
+                "total_duration": step_totals[i],
+                "average_duration": step_totals[i] / step_counts[i],
+                "min_duration": step_mins[i],
+                "max_duration": step_maxs[i],
+                "count": step_counts[i]
+            }
 
         # Sort orders by start time
-        self.summary["orders"] = sorted(
-            self.timing_data,
-            key=lambda x: datetime.fromisoformat(x["flow_start"]).timestamp()
-        )
+        self.summary["orders"].sort(key=lambda x: x["start"])
+
+    def generate_report(self, output_dir: Optional[str] = None, output_format: str = "json") -> Dict:
+        """Generate the summary report.
 
-    def generate_report(self, output_dir: Optional[str] = None) -> Dict:
-        """Generate the summary report."""
+        output_format is "json" for indented JSON or "json.gz" for compact,
+        gzip-compressed JSON suited to pipelines that re-read summaries.
+        """
         self.load_timing_data()
         self.calculate_metrics()
 
-        # Convert defaultdict to regular dict for JSON serialization
-        self.summary["step_metrics"] = dict(self.summary["step_metrics"])
-
         # Save JSON report
         if output_dir:
             output_path = Path(output_dir)
             output_path.mkdir(parents=True, exist_ok=True)
-            report_name = f"summary_{self.reports_dir.name}.json"
+            report_name = f"summary_{self.batch_id}.{output_format}"
             json_path = output_path / report_name
-            with open(json_path, 'w') as f:
-                json.dump(self.summary, f, indent=2)
+            if output_format == "json.gz":
+                json_path.write_bytes(gzip.compress(orjson.dumps(self.summary), compresslevel=6))
+            else:
+                json_path.write_bytes(orjson.dumps(self.summary, option=orjson.OPT_INDENT_2))
             print(f"JSON summary saved to: {json_path}")
 
         return self.summary
 
     def print_human_readable(self):
         """Print a human-readable summary of the report."""
-        print("\n=== Timing Summary Report ===")
-        print(f"Directory: {self.reports_dir}")
+        # Collect lines and write them in one call rather than one print per line
+        lines = []
+        lines.append("\n=== Timing Summary Report ===")
+        lines.append(f"Directory: {self.reports_dir}")
         
         if self.summary["total_orders"] == 0:
-            print("\nNo orders found in this directory.")
+            lines.append("\nNo orders found in this directory.")
+            sys.stdout.write("\n".join(lines) + "\n")
             return
 
-        print(f"\nOverall Metrics:")
-        print(f"Total Orders: {self.summary['total_orders']}")
-        print(f"Successful Orders: {self.summary['successful_orders']}")
-        print(f"Failed Orders: {self.summary['failed_orders']}")
-        print(f"Success Rate: {(self.summary['successful_orders'] / self.summary['total_orders'] * 100):.1f}%")
-        print(f"\nTiming Metrics:")
-        print(f"Average Duration: {self.summary['average_duration']:.2f}s")
-        print(f"Min Duration: {self.summary['min_duration']:.2f}s")
-        print(f"Max Duration: {self.summary['max_duration']:.2f}s")
-        print(f"Total Duration: {self.summary['total_duration']:.2f}s")
-
-        print("\nStep-by-Step Metrics:")
+        lines.append(f"\nOverall Metrics:")
+        lines.append(f"Total Orders: {self.summary['total_orders']}")
+        lines.append(f"Successful Orders: {self.summary['successful_orders']}")
+        lines.append(f"Failed Orders: {self.summary['failed_orders']}")
+        lines.append(f"Success Rate: {(self.summary['successful_orders'] / self.summary['total_orders'] * 100):.1f}%")
+        lines.append(f"\nTiming Metrics:")
+        lines.append(f"Average Duration: {self.summary['average_duration']:.2f}s")
+        lines.append(f"Min Duration: {self.summary['min_duration']:.2f}s")
+        lines.append(f"Max Duration: {self.summary['max_duration']:.2f}s")
+        lines.append(f"Total Duration: {self.summary['total_duration']:.2f}s")
+
+        lines.append("\nStep-by-Step Metrics:")
         for step_name, metrics in sorted(self.summary["step_metrics"].items()):
-            print(f"\n{step_name}:")
-            print(f"  Average: {metrics['average_duration']:.2f}s")
-            print(f"  Min: {metrics['min_duration']:.2f}s")
-            print(f"  Max: {metrics['max_duration']:.2f}s")
-            print(f"  Total: {metrics['total_duration']:.2f}s")
-            print(f"  Count: {metrics['count']}")
-
-        print("\nBatch Metrics:")
+            lines.append(f"\n{step_name}:")
+            lines.append(f"  Average: {metrics['average_duration']:.2f}s")
+            lines.append(f"  Min: {metrics['min_duration']:.2f}s")
+            lines.append(f"  Max: {metrics['max_duration']:.2f}s")
+            lines.append(f"  Total: {metrics['total_duration']:.2f}s")
+            lines.append(f"  Count: {metrics['count']}")
+
+        lines.append("\nBatch Metrics:")
         for batch in sorted(self.summary["batch_metrics"], key=lambda x: x["start_time"] if x["start_time"] else 0):
-            start_time = datetime.fromtimestamp(batch["start_time"]).strftime("%H:%M:%S")
-            print(f"\nBatch: {batch['batch_id']}")
-            print(f"  Start Time: {start_time}")
-            print(f"  Orders: {batch['order_count']}")
-            print(f"  Successful: {batch['successful_orders']}")
-            print(f"  Failed: {batch['failed_orders']}")
-            print(f"  Duration: {batch['total_duration']:.2f}s")
+            lines.append(f"\nBatch: {batch['batch_id']}")
+            lines.append(f"  Start Time: {batch['start_time_str']}")
+            lines.append(f"  Orders: {batch['order_count']}")
+            lines.append(f"  Successful: {batch['successful_orders']}")
+            lines.append(f"  Failed: {batch['failed_orders']}")
+            lines.append(f"  Duration: {batch['total_duration']:.2f}s")
+
+        sys.stdout.write("\n".join(lines) + "\n")
 
 def main():
     parser = argparse.ArgumentParser(description="Generate timing summary reports")
-    parser.add_argument("--reports", required=True, help="Directory containing timing reports to analyze")
+    parser.add_argument("--reports", required=True,
+                        help="Directory containing timing reports, or a .jsonl file written with --aggregate-reports, to analyze")
     parser.add_argument("--output-dir", help="Directory to save summary reports")
+    parser.add_argument("--format", choices=["json", "json.gz"], default="json",
+                        help="Summary file format: indented JSON or compact gzip-compressed JSON (default: json)")
     args = parser.parse_args()
 
     summary = TimingSummary(args.reports)
-    summary.generate_report(args.output_dir)
+    summary.generate_report(args.output_dir, args.format)
     summary.print_human_readable()
 
 if __name__ == "__main__":
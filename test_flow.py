@@ -1,74 +1,207 @@
 #!/usr/bin/env python3
 
 import os
-import json
+import sys
 import logging
-import requests
 import argparse
 from dotenv import load_dotenv
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Mapping, Tuple, Callable, Awaitable
 import time
-from datetime import datetime
+from datetime import datetime, timedelta
+from dataclasses import dataclass
+from types import MappingProxyType
 import pathlib
+import threading
+import signal
 import asyncio
+import contextvars
+import functools
+import random
 import aiohttp
+import orjson
+
+class _CachedTimeFormatter(logging.Formatter):
+    """Log formatter that renders each second's timestamp once, since batches log many lines a second"""
+    _cache = (None, '')
+
+    def formatTime(self, record: logging.LogRecord, datefmt: Optional[str] = None) -> str:
+        if datefmt:
+            return super().formatTime(record, datefmt)
+        second = int(record.created)
+        cached_second, text = self._cache
+        if second != cached_second:
+            text = time.strftime(self.default_time_format, self.converter(record.created))
+            # Replaced as one tuple so a record logged from another thread never sees a half update
+            self._cache = (second, text)
+        return self.default_msec_format % (text, record.msecs)
 
 # Configure logging
+_log_handler = logging.StreamHandler()
+_log_handler.setFormatter(_CachedTimeFormatter('%(asctime)s - %(levelname)s - %(message)s'))
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
+    handlers=[_log_handler]
 )
 logger = logging.getLogger(__name__)
 
+# First B2B poll retry delay in seconds; doubles on each attempt up to the configured delay
+POLL_INITIAL_DELAY = 0.5
+
+# Poll responses that mean "not ready yet" rather than a hard failure
+POLL_RETRY_STATUSES = frozenset({404, 429, 502, 503, 504})
+
+# Transient API responses retried by _request, with exponential backoff from REQUEST_BACKOFF_FACTOR.
+# Gateway errors are only retried for idempotent methods, since a POST may already have been applied.
+REQUEST_MAX_RETRIES = 3
+REQUEST_BACKOFF_FACTOR = 0.3
+# Longest _request will wait between retries, even when a Retry-After header asks for more
+REQUEST_MAX_DELAY = 10
+REQUEST_RETRY_STATUSES = frozenset({429, 503})
+REQUEST_IDEMPOTENT_RETRY_STATUSES = frozenset({429, 502, 503, 504})
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'PUT'})
+
+# Connection pool cap (aiohttp's default); raised when more orders run at once than it allows
+DEFAULT_CONNECTION_LIMIT = 100
+
+# Fail fast on unreachable hosts and bound how long a stalled response can hang the flow
+REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=None, sock_connect=3.05, sock_read=30)
+
+def _orjson_dumps(obj: Any) -> str:
+    """JSON encoder for aiohttp request bodies, using orjson instead of the stdlib"""
+    return orjson.dumps(obj).decode()
+
+def _backoff(attempt: int, base: float, cap: float, factor: float = 2.0) -> float:
+    """Exponential backoff delay for a retry attempt, capped and jittered so concurrent retries spread out"""
+    # Jitter around the nominal delay rather than below it, so the total time spent
+    # retrying averages out to the nominal schedule instead of shrinking
+    return min(cap, base * factor ** attempt) * random.uniform(0.75, 1.25)
+
+def _retry_after_seconds(retry_after: Optional[str], default: float) -> float:
+    """Parse a Retry-After header given in seconds, falling back to the default delay"""
+    if retry_after is not None:
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            pass
+    return default
+
+async def _json(response: aiohttp.ClientResponse) -> Any:
+    """Decode a response body with orjson rather than aiohttp's stdlib-based response.json()"""
+    return orjson.loads(await response.read())
+
+# B2B Storefront GraphQL query used to confirm an order is visible to the buyer
+ALL_ORDERS_QUERY = """
+query AllOrders($bcOrderId: Decimal!) {
+    allOrders(bcOrderId: $bcOrderId) {
+        totalCount
+        edges {
+            cursor
+            node {
+                id
+                createdAt
+                updatedAt
+                bcOrderId
+                companyName
+            }
+        }
+    }
+}
+"""
+
+# AllOrders request body serialized once, leaving only the order ID to fill in per request
+ALL_ORDERS_BODY_TEMPLATE = b'{"query":' + orjson.dumps(ALL_ORDERS_QUERY) + b',"variables":{"bcOrderId":%d}}'
+
+# Storefront lookups for a new order before reporting it missing, and the cap on the
+# delay between them; the storefront index can lag behind the B2B Orders API
+VERIFY_MAX_ATTEMPTS = 5
+VERIFY_MAX_DELAY = 5
+
+# Fixture files read by the checkout flow, resolved relative to this script rather than the working directory
+TEST_DATA_DIR = pathlib.Path(__file__).resolve().parent / 'test-data'
+TEST_DATA_FILES = ('cart-payload.json', 'checkout-shipping-address.json', 'checkout-billing-address.json')
+
 class TimingTracker:
-    def __init__(self, reports_dir="reports", is_batch=False, batch_start_time=None):
+    # Report directories already created by this process, so batches of orders
+    # finishing together don't each repeat the mkdir
+    _created_dirs = set()
+    # Serializes appends to shared JSONL report files across writer threads
+    _append_lock = threading.Lock()
+    # Background writer shared by all trackers while run() is active; when unset,
+    # end_flow waits for its own report to be written
+    report_writer = None
+
+    def __init__(self, reports_dir="reports", is_batch=False, batch_start_time=None, aggregate=False):
         self.reports_dir = reports_dir
         self.is_batch = is_batch
+        # Append reports as lines of one JSONL file per batch or date instead of a file per order
+        self.aggregate = aggregate
         self.batch_start_time = batch_start_time or datetime.now()
         self.start_time = None
         self.end_time = None
         self.steps = {}
         self.current_step = None
         self.current_step_start = None
+        # API round-trips made by this order's flow, including retries and polls
+        self.request_count = 0
+        # Steps are timed with the monotonic perf counter; wall-clock times for the
+        # report are derived from the flow's start once, when it is saved
+        self._start_ns = None
+        self._step_ns = {}
         self.order_id = None
         self.order_number = None
 
     def start_flow(self, order_id=None, order_number=None):
         """Start timing the entire flow."""
         self.start_time = datetime.now()
+        self._start_ns = time.perf_counter_ns()
         self.order_id = order_id
         self.order_number = order_number
-        logger.info(f"Starting timing for {'batch' if self.is_batch else 'single'} order flow")
+        logger.info("Starting timing for %s order flow", 'batch' if self.is_batch else 'single')
+
+    def _wall_time(self, ns: int) -> datetime:
+        """Convert a perf counter reading taken during this flow to wall-clock time"""
+        return self.start_time + timedelta(microseconds=(ns - self._start_ns) / 1000)
 
     def start_step(self, step_name):
         """Start timing a specific step."""
         if self.current_step:
             self.end_step()
         self.current_step = step_name
-        self.current_step_start = datetime.now()
-        logger.info(f"Starting step: {step_name}")
+        self.current_step_start = time.perf_counter_ns()
+        logger.info("Starting step: %s", step_name)
 
     def end_step(self):
         """End timing for the current step."""
-        if self.current_step and self.current_step_start:
-            duration = (datetime.now() - self.current_step_start).total_seconds()
-            self.steps[self.current_step] = {
-                "start": self.current_step_start.isoformat(),
-                "end": datetime.now().isoformat(),
-                "duration": duration
-            }
-            logger.info(f"Completed step: {self.current_step} (Duration: {duration:.2f}s)")
+        if self.current_step and self.current_step_start is not None:
+            end_ns = time.perf_counter_ns()
+            duration = (end_ns - self.current_step_start) / 1e9
+            self._step_ns[self.current_step] = (self.current_step_start, end_ns)
+            self.steps[self.current_step] = {"duration": duration}
+            logger.info("Completed step: %s (Duration: %.2fs)", self.current_step, duration)
             self.current_step = None
             self.current_step_start = None
 
-    def end_flow(self):
+    async def end_flow(self):
         """End timing the entire flow and save the report."""
-        self.end_time = datetime.now()
         if self.current_step:
             self.end_step()
+        end_ns = time.perf_counter_ns()
+        self.end_time = self._wall_time(end_ns)
         
-        total_duration = (self.end_time - self.start_time).total_seconds()
-        logger.info(f"Completed order flow (Total Duration: {total_duration:.2f}s)")
+        total_duration = (end_ns - self._start_ns) / 1e9
+        logger.info("Completed order flow (Total Duration: %.2fs)", total_duration)
+
+        # Fill in each step's wall-clock start and end for the report
+        wall_time = self._wall_time
+        steps = self.steps
+        self.steps = {
+            step_name: {
+                "start": wall_time(start_ns).isoformat(),
+                "end": wall_time(step_end_ns).isoformat(),
+                "duration": steps[step_name]["duration"]
+            }
+            for step_name, (start_ns, step_end_ns) in self._step_ns.items()
+        }
 
         # Create report data
         report_data = {
@@ -77,6 +210,7 @@ class TimingTracker:
             "flow_start": self.start_time.isoformat(),
             "flow_end": self.end_time.isoformat(),
             "total_duration": total_duration,
+            "request_count": self.request_count,
             "steps": self.steps
         }
 
@@ -90,23 +224,138 @@ class TimingTracker:
             date_dir = self.start_time.strftime("%Y-%m-%d")
             report_dir = os.path.join(self.reports_dir, date_dir)
 
-        # Create directory if it doesn't exist
-        os.makedirs(report_dir, exist_ok=True)
+        if self.aggregate:
+            report_path = f"{report_dir}.jsonl"
+            await self._save(
+                functools.partial(self._append_report, self.reports_dir, report_path, report_data),
+                "Timing report appended to: %s", report_path
+            )
+            return report_path
 
         # Generate filename with order number and timestamp
         timestamp = self.start_time.strftime("%H-%M-%S")
         filename = f"order_{self.order_number}_{timestamp}.json" if self.order_number else f"order_{self.order_id}_{timestamp}.json"
         
-        # Save report
         report_path = os.path.join(report_dir, filename)
-        with open(report_path, "w") as f:
-            json.dump(report_data, f, indent=2)
-        
-        logger.info(f"Timing report saved to: {report_path}")
+        await self._save(
+            functools.partial(self._write_report, report_dir, report_path, report_data),
+            "Timing report saved to: %s", report_path
+        )
         return report_path
 
-class BCTestFlow:
+    async def _save(self, write, message: str, report_path: str):
+        """Hand a report write to the background writer, or run it on a worker thread if there is none"""
+        if self.report_writer is not None:
+            self.report_writer.submit(write, message, report_path)
+            return
+        # Save report on a worker thread so file I/O doesn't stall other orders' requests
+        await asyncio.to_thread(write)
+        logger.info(message, report_path)
+
+    @classmethod
+    def _write_report(cls, report_dir: str, report_path: str, report_data: Dict[str, Any]):
+        """Write a report file, creating its directory the first time it's used"""
+        if report_dir not in cls._created_dirs:
+            os.makedirs(report_dir, exist_ok=True)
+            cls._created_dirs.add(report_dir)
+        with open(report_path, "wb") as f:
+            f.write(orjson.dumps(report_data, option=orjson.OPT_INDENT_2))
+
+    @classmethod
+    def _append_report(cls, reports_dir: str, report_path: str, report_data: Dict[str, Any]):
+        """Append a report as one JSON line, creating the reports directory the first time it's used"""
+        if reports_dir not in cls._created_dirs:
+            os.makedirs(reports_dir, exist_ok=True)
+            cls._created_dirs.add(reports_dir)
+        line = orjson.dumps(report_data, option=orjson.OPT_APPEND_NEWLINE)
+        with cls._append_lock, open(report_path, "ab") as f:
+            f.write(line)
+
+class ReportWriter:
+    """Writes timing reports from a queue on one background task, so orders don't wait on disk"""
+
     def __init__(self):
+        self._queue = asyncio.Queue()
+        self._task = None
+
+    def start(self):
+        """Start the task that drains the queue"""
+        self._task = asyncio.create_task(self._drain())
+
+    def submit(self, write, message: str, report_path: str):
+        """Queue a report write, logging message with report_path once it's on disk"""
+        self._queue.put_nowait((write, message, report_path))
+
+    async def _drain(self):
+        """Run queued writes one at a time on a worker thread"""
+        while True:
+            write, message, report_path = await self._queue.get()
+            try:
+                await asyncio.to_thread(write)
+                logger.info(message, report_path)
+            except Exception as e:
+                logger.error("Failed to write timing report %s: %s", report_path, e)
+            finally:
+                self._queue.task_done()
+
+    async def close(self):
+        """Wait for queued reports to be written, then stop the drain task"""
+        await self._queue.join()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+# Timing tracker of the order flow running in the current task, so API calls can be
+# attributed to the right order when several share one BCTestFlow
+_current_timing: contextvars.ContextVar[Optional[TimingTracker]] = contextvars.ContextVar('current_timing', default=None)
+
+def _count_request():
+    """Count an API round-trip against the order flow running in the current task"""
+    timing = _current_timing.get()
+    if timing is not None:
+        timing.request_count += 1
+
+class SlotController:
+    """Caps how many orders run at once; unlike asyncio.Semaphore, the cap can be changed while orders are running"""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.active = 0
+        self._condition = asyncio.Condition()
+
+    async def acquire(self):
+        """Wait until fewer than limit orders are running, then take a slot"""
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.active < self.limit)
+            self.active += 1
+
+    async def release(self):
+        """Give back a slot and wake one waiting order"""
+        async with self._condition:
+            self.active -= 1
+            self._condition.notify(1)
+
+    async def set_limit(self, limit: int):
+        """Change the cap; running orders are never interrupted, so lowering it takes effect as they finish"""
+        async with self._condition:
+            self.limit = max(1, limit)
+            self._condition.notify_all()
+        logger.info("Max concurrent orders set to %s (%s running)", self.limit, self.active)
+
+class BCTestFlow:
+    # Pre-serialized order status update body; 11 is the status ID for "Awaiting Fulfillment"
+    AWAITING_FULFILLMENT_BODY = orjson.dumps({"status_id": 11})
+
+    def __init__(self, erp_delay: float = 0.4, max_concurrent: int = 1, poll_backoff_factor: float = 2.0):
+        # Simulated ERP processing time in seconds; 0 skips the wait entirely
+        self.erp_delay = erp_delay
+        # Growth of the B2B poll delay per attempt; lower values poll more often before reaching the cap
+        self.poll_backoff_factor = poll_backoff_factor
+        # Each order can have two requests in flight at once (shipping option and billing)
+        self.connection_limit = max(DEFAULT_CONNECTION_LIMIT, max_concurrent * 2)
+
         # Load environment variables
         load_dotenv()
         
@@ -114,6 +363,8 @@ class BCTestFlow:
         self.store_hash = os.getenv('BC_STORE_HASH')
         self.access_token = os.getenv('BC_ACCESS_TOKEN')
         self.b2b_access_token = os.getenv('B2B_ACCESS_TOKEN')
+        # Only storefront verification needs this, so it is checked there rather than here
+        self.storefront_token = os.getenv('B2B_STOREFRONT_TOKEN')
         
         # Validate required environment variables
         if not all([self.store_hash, self.access_token, self.b2b_access_token]):
@@ -123,231 +374,325 @@ class BCTestFlow:
         self.bc_base_url = f"https://api.bigcommerce.com/stores/{self.store_hash}"
         self.b2b_base_url = "https://api-b2b.bigcommerce.com/api/v3/io"
         
-        # Set up headers
-        self.bc_headers = {
+        # Set up headers; these are handed to the sessions once, so keep them read-only
+        self.bc_headers = MappingProxyType({
             'X-Auth-Token': self.access_token,
             'Content-Type': 'application/json',
             'Accept': 'application/json'
-        }
+        })
         
-        self.b2b_headers = {
+        self.b2b_headers = MappingProxyType({
             'authToken': self.b2b_access_token,
             'Content-Type': 'application/json',
             'Accept': 'application/json'
-        }
+        })
+        
+        self.storefront_headers = MappingProxyType({
+            'Authorization': f'Bearer {self.storefront_token}',
+            'Content-Type': 'application/json',
+            'Accept': 'application/json'
+        })
+
+        self._sessions: Dict[str, aiohttp.ClientSession] = {}
+        self._connector: Optional[aiohttp.TCPConnector] = None
+
+    def _get_connector(self) -> aiohttp.TCPConnector:
+        """Return the connection pool shared by all API sessions, creating it on first use
+
+        Sharing one pool means one DNS cache for the run, and lets the B2B and storefront
+        sessions reuse each other's idle connections to api-b2b.bigcommerce.com.
+        """
+        if self._connector is None or self._connector.closed:
+            # Keep idle connections open long enough to span polling and inter-order delays, and
+            # cache DNS for the whole run since the API hosts don't change mid-test
+            # (aiohttp already sets TCP_NODELAY on its sockets, so small JSON bodies are not held back by Nagle)
+            self._connector = aiohttp.TCPConnector(limit=self.connection_limit, ttl_dns_cache=300, keepalive_timeout=60)
+        return self._connector
+
+    def _get_session(self, name: str, headers: Mapping[str, str]) -> aiohttp.ClientSession:
+        """Return the HTTP session for an API, creating it on first use"""
+        session = self._sessions.get(name)
+        if session is None or session.closed:
+            session = aiohttp.ClientSession(
+                connector=self._get_connector(),
+                connector_owner=False,
+                headers=headers,
+                timeout=REQUEST_TIMEOUT,
+                json_serialize=_orjson_dumps
+            )
+            self._sessions[name] = session
+        return session
+
+    @property
+    def bc_session(self) -> aiohttp.ClientSession:
+        """Session for the BigCommerce store API, carrying the store auth headers"""
+        return self._get_session('bc', self.bc_headers)
 
-    async def load_test_data(self, filename: str) -> Dict[str, Any]:
-        """Load test data from a JSON file"""
+    @property
+    def b2b_session(self) -> aiohttp.ClientSession:
+        """Session for the B2B Edition server-to-server API, carrying the B2B auth headers"""
+        return self._get_session('b2b', self.b2b_headers)
+
+    @property
+    def sf_session(self) -> aiohttp.ClientSession:
+        """Session for the B2B Storefront GraphQL API, carrying the storefront bearer token"""
+        return self._get_session('storefront', self.storefront_headers)
+
+    async def __aenter__(self) -> 'BCTestFlow':
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def close(self):
+        """Close all HTTP sessions and their shared connection pool"""
+        for session in self._sessions.values():
+            if not session.closed:
+                await session.close()
+        self._sessions.clear()
+        if self._connector is not None:
+            await self._connector.close()
+            self._connector = None
+
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def _read_test_data(file_path: pathlib.Path) -> Dict[str, Any]:
+        """Read and parse a test data file once per run; the result is shared and must not be mutated"""
+        return orjson.loads(file_path.read_bytes())
+
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def _read_test_data_bytes(file_path: pathlib.Path) -> bytes:
+        """Serialize a test data file once per run so it can be sent as a ready-made request body"""
+        return orjson.dumps(BCTestFlow._read_test_data(file_path))
+
+    async def preload_test_data(self):
+        """Read all fixture files concurrently on worker threads so later loads are cache hits"""
+        await asyncio.gather(*(
+            asyncio.to_thread(self._read_test_data, TEST_DATA_DIR / filename)
+            for filename in TEST_DATA_FILES
+        ))
+
+    def load_test_data(self, filename: str, as_bytes: bool = False) -> Any:
+        """Load cached test data from a JSON file, optionally as pre-serialized JSON bytes"""
         try:
-            file_path = os.path.join('test-data', filename)
-            with open(file_path, 'r') as f:
-                data = json.load(f)
-            logger.info(f"Successfully loaded test data from {filename}")
+            file_path = TEST_DATA_DIR / filename
+            data = self._read_test_data_bytes(file_path) if as_bytes else self._read_test_data(file_path)
+            logger.info("Successfully loaded test data from %s", filename)
             return data
         except FileNotFoundError:
-            logger.error(f"Test data file not found: {filename}")
+            logger.error("Test data file not found: %s", filename)
             raise
-        except json.JSONDecodeError:
-            logger.error(f"Invalid JSON in test data file: {filename}")
+        except orjson.JSONDecodeError:
+            logger.error("Invalid JSON in test data file: %s", filename)
             raise
 
-    async def create_cart(self, session: aiohttp.ClientSession) -> Dict[str, Any]:
+    async def _request(
+        self, session: aiohttp.ClientSession, method: str, url: str, error_message: str,
+        return_body: bool = True, **kwargs
+    ) -> Any:
+        """Send a request and return the decoded JSON body, logging and re-raising client errors
+
+        With return_body=False the body is read but not decoded, and None is returned.
+        Rate limiting and temporary unavailability are retried up to REQUEST_MAX_RETRIES
+        times, honouring any Retry-After header up to REQUEST_MAX_DELAY. The body of
+        an error response is logged alongside the error, since that is where the APIs
+        explain what was rejected.
+        """
+        retry_statuses = REQUEST_IDEMPOTENT_RETRY_STATUSES if method in IDEMPOTENT_METHODS else REQUEST_RETRY_STATUSES
+        for attempt in range(REQUEST_MAX_RETRIES + 1):
+            response_text = None
+            try:
+                _count_request()
+                async with session.request(method, url, **kwargs) as response:
+                    if response.status not in retry_statuses or attempt == REQUEST_MAX_RETRIES:
+                        if response.status >= 400:
+                            response_text = await response.text(errors='replace')
+                        response.raise_for_status()
+                        if not return_body:
+                            # Still drain the body; aiohttp closes connections with unread
+                            # bodies instead of returning them to the pool
+                            await response.read()
+                            return None
+                        return await _json(response)
+                    status = response.status
+                    delay = min(REQUEST_MAX_DELAY, _retry_after_seconds(
+                        response.headers.get('Retry-After'),
+                        _backoff(attempt, REQUEST_BACKOFF_FACTOR, REQUEST_MAX_DELAY)
+                    ))
+            except aiohttp.ClientError as e:
+                logger.error("%s: %s", error_message, e)
+                if response_text is not None:
+                    logger.error("Response details: %s", response_text)
+                raise
+            logger.warning("%s %s returned HTTP %s. Retrying in %.2f seconds...", method, url, status, delay)
+            await asyncio.sleep(delay)
+
+    async def create_cart(self) -> Dict[str, Any]:
         """Create a new cart using test data"""
-        try:
-            payload = await self.load_test_data('cart-payload.json')
-            url = f"{self.bc_base_url}/v3/carts"
-            
-            async with session.post(url, headers=self.bc_headers, json=payload) as response:
-                response.raise_for_status()
-                cart_data = await response.json()
-                logger.info(f"Successfully created cart with ID: {cart_data['data']['id']}")
-                return cart_data['data']
-                
-        except aiohttp.ClientError as e:
-            logger.error(f"Error creating cart: {str(e)}")
-            raise
+        body = self.load_test_data('cart-payload.json', as_bytes=True)
+        url = f"{self.bc_base_url}/v3/carts"
+        cart_data = await self._request(self.bc_session, 'POST', url, "Error creating cart", data=body)
+        logger.info("Successfully created cart with ID: %s", cart_data['data']['id'])
+        return cart_data['data']
 
-    async def add_shipping_address(self, session: aiohttp.ClientSession, cart_id: str) -> Dict[str, Any]:
-        """Add shipping address to the cart and get shipping options"""
-        try:
-            shipping_address = await self.load_test_data('checkout-shipping-address.json')
-            
-            # First get the cart to get line item IDs
+    async def add_shipping_address(self, cart: Dict[str, Any]) -> Tuple[str, str, Dict[str, Any]]:
+        """Add shipping address to the cart and get shipping options
+
+        Takes the cart returned by create_cart. Returns the first consignment's ID,
+        its first available shipping option ID, and the full checkout data.
+        """
+        shipping_address = self.load_test_data('checkout-shipping-address.json')
+        cart_id = cart['id']
+        
+        # The created cart already lists its line items; only re-fetch if it doesn't
+        if 'line_items' not in cart:
             cart_url = f"{self.bc_base_url}/v3/carts/{cart_id}"
-            async with session.get(cart_url, headers=self.bc_headers) as response:
-                response.raise_for_status()
-                cart_data = await response.json()
-            
-            # Get the first physical item ID
-            line_item_id = cart_data['data']['line_items']['physical_items'][0]['id']
-            
-            # Add shipping address with line item
-            url = f"{self.bc_base_url}/v3/checkouts/{cart_id}/consignments"
-            params = {
-                'include': 'consignments.available_shipping_options'
+            cart = (await self._request(self.bc_session, 'GET', cart_url, "Error adding shipping address"))['data']
+        
+        # Get the first physical item ID
+        line_item_id = cart['line_items']['physical_items'][0]['id']
+        
+        # Add shipping address with line item
+        url = f"{self.bc_base_url}/v3/checkouts/{cart_id}/consignments"
+        params = {
+            'include': 'consignments.available_shipping_options'
+        }
+        
+        payload = [
+            {
+                "shipping_address": shipping_address,
+                "line_items": [
+                    {
+                        "item_id": line_item_id,
+                        "quantity": 1
+                    }
+                ]
             }
-            
-            payload = [
-                {
-                    "shipping_address": shipping_address,
-                    "line_items": [
-                        {
-                            "item_id": line_item_id,
-                            "quantity": 1
-                        }
-                    ]
-                }
-            ]
-            
-            async with session.post(url, headers=self.bc_headers, params=params, json=payload) as response:
-                response.raise_for_status()
-                consignment_data = await response.json()
-                logger.info(f"Successfully added shipping address and got shipping options")
-                return consignment_data['data']
-                
-        except aiohttp.ClientError as e:
-            logger.error(f"Error adding shipping address: {str(e)}")
-            raise
+        ]
+        
+        consignment_data = (await self._request(
+            self.bc_session, 'POST', url, "Error adding shipping address", params=params, json=payload
+        ))['data']
+        logger.info("Successfully added shipping address and got shipping options")
+        consignment = consignment_data['consignments'][0]
+        return consignment['id'], consignment['available_shipping_options'][0]['id'], consignment_data
 
-    async def update_shipping_option(self, session: aiohttp.ClientSession, cart_id: str, consignment_id: str, shipping_option_id: str) -> Dict[str, Any]:
-        """Update the shipping option for a consignment"""
-        try:
-            url = f"{self.bc_base_url}/v3/checkouts/{cart_id}/consignments/{consignment_id}"
-            payload = {
-                "shipping_option_id": shipping_option_id
-            }
-            
-            async with session.put(url, headers=self.bc_headers, json=payload) as response:
-                response.raise_for_status()
-                consignment_data = await response.json()
-                logger.info(f"Successfully updated shipping option")
-                return consignment_data['data']
-                
-        except aiohttp.ClientError as e:
-            logger.error(f"Error updating shipping option: {str(e)}")
-            raise
+    async def update_shipping_option(
+        self, cart_id: str, consignment_id: str, shipping_option_id: str, return_body: bool = False
+    ) -> Optional[Dict[str, Any]]:
+        """Update the shipping option for a consignment, returning the checkout only if return_body is set"""
+        url = f"{self.bc_base_url}/v3/checkouts/{cart_id}/consignments/{consignment_id}"
+        payload = {
+            "shipping_option_id": shipping_option_id
+        }
+        consignment_data = await self._request(
+            self.bc_session, 'PUT', url, "Error updating shipping option", return_body=return_body, json=payload
+        )
+        logger.info("Successfully updated shipping option")
+        return consignment_data['data'] if return_body else None
 
-    async def add_billing_address(self, session: aiohttp.ClientSession, cart_id: str) -> Dict[str, Any]:
-        """Add billing address to the checkout"""
-        try:
-            billing_address = await self.load_test_data('checkout-billing-address.json')
-            
-            url = f"{self.bc_base_url}/v3/checkouts/{cart_id}/billing-address"
-            async with session.post(url, headers=self.bc_headers, json=billing_address) as response:
-                response.raise_for_status()
-                billing_data = await response.json()
-                logger.info(f"Successfully added billing address")
-                return billing_data['data']
-                
-        except aiohttp.ClientError as e:
-            logger.error(f"Error adding billing address: {str(e)}")
-            raise
+    async def add_billing_address(self, cart_id: str, return_body: bool = False) -> Optional[Dict[str, Any]]:
+        """Add billing address to the checkout, returning the checkout only if return_body is set"""
+        body = self.load_test_data('checkout-billing-address.json', as_bytes=True)
+        url = f"{self.bc_base_url}/v3/checkouts/{cart_id}/billing-address"
+        billing_data = await self._request(
+            self.bc_session, 'POST', url, "Error adding billing address", return_body=return_body, data=body
+        )
+        logger.info("Successfully added billing address")
+        return billing_data['data'] if return_body else None
 
-    async def create_order(self, session: aiohttp.ClientSession, cart_id: str) -> Dict[str, Any]:
+    async def create_order(self, cart_id: str) -> Dict[str, Any]:
         """Create an order from the checkout"""
-        try:
-            url = f"{self.bc_base_url}/v3/checkouts/{cart_id}/orders"
-            async with session.post(url, headers=self.bc_headers) as response:
-                response.raise_for_status()
-                order_data = await response.json()
-                logger.info(f"Successfully created order with ID: {order_data['data']['id']}")
-                return order_data['data']
-                
-        except aiohttp.ClientError as e:
-            logger.error(f"Error creating order: {str(e)}")
-            raise
+        url = f"{self.bc_base_url}/v3/checkouts/{cart_id}/orders"
+        order_data = await self._request(self.bc_session, 'POST', url, "Error creating order")
+        logger.info("Successfully created order with ID: %s", order_data['data']['id'])
+        return order_data['data']
 
-    async def update_order_status(self, session: aiohttp.ClientSession, order_id: int) -> Dict[str, Any]:
+    async def update_order_status(self, order_id: int) -> Dict[str, Any]:
         """Update the order status to 'Awaiting Fulfillment'"""
-        try:
-            url = f"{self.bc_base_url}/v2/orders/{order_id}"
-            payload = {
-                "status_id": 11  # 11 is the status ID for "Awaiting Fulfillment"
-            }
-            
-            async with session.put(url, headers=self.bc_headers, json=payload) as response:
-                response.raise_for_status()
-                order_data = await response.json()
-                logger.info(f"Successfully updated order {order_id} status to Awaiting Fulfillment")
-                return order_data
-                
-        except aiohttp.ClientError as e:
-            logger.error(f"Error updating order status: {str(e)}")
-            raise
+        url = f"{self.bc_base_url}/v2/orders/{order_id}"
+        order_data = await self._request(
+            self.bc_session, 'PUT', url, "Error updating order status", data=self.AWAITING_FULFILLMENT_BODY
+        )
+        logger.info("Successfully updated order %s status to Awaiting Fulfillment", order_id)
+        return order_data
 
-    async def poll_b2b_order(self, session: aiohttp.ClientSession, order_id: int, max_retries: int = 6, delay_seconds: int = 5) -> Dict[str, Any]:
-        """Poll the B2B Orders API for a specific order with retry logic"""
+    async def poll_b2b_order(self, order_id: int, max_retries: int = 9, max_delay_seconds: float = 5) -> Dict[str, Any]:
+        """Poll the B2B Orders API for a specific order with retry logic
+
+        A 404 means the order hasn't propagated to B2B yet; 429 and gateway errors
+        are treated as transient. Both are retried, honouring any Retry-After header
+        up to max_delay_seconds. Retries start after POLL_INITIAL_DELAY and back off
+        exponentially with jitter by poll_backoff_factor, capped at max_delay_seconds,
+        so an order that propagates quickly is picked up quickly.
+        """
+        url = f"{self.b2b_base_url}/orders/{order_id}"
         for attempt in range(max_retries):
+            is_last_attempt = attempt == max_retries - 1
+            delay = _backoff(attempt, POLL_INITIAL_DELAY, max_delay_seconds, self.poll_backoff_factor)
             try:
-                url = f"{self.b2b_base_url}/orders/{order_id}"
-                async with session.get(url, headers=self.b2b_headers) as response:
+                # Read the outcome inside the response context but sleep outside it,
+                # so the connection goes back to the pool while we wait
+                _count_request()
+                async with self.b2b_session.get(url) as response:
                     if response.status == 200:
-                        order_data = await response.json()
-                        logger.info(f"Successfully retrieved B2B order {order_id} on attempt {attempt + 1}")
+                        order_data = await _json(response)
+                        logger.info("Successfully retrieved B2B order %s on attempt %s", order_id, attempt + 1)
                         return order_data
-                    elif response.status == 404:
-                        if attempt < max_retries - 1:
-                            logger.info(f"B2B order {order_id} not found yet. Attempt {attempt + 1} of {max_retries}. Retrying in {delay_seconds} seconds...")
-                            await asyncio.sleep(delay_seconds)
-                            continue
-                        else:
-                            raise Exception(f"B2B order {order_id} not found after {max_retries} attempts")
-                    else:
+                    if response.status not in POLL_RETRY_STATUSES:
                         response.raise_for_status()
-                        
-            except aiohttp.ClientError as e:
-                if attempt < max_retries - 1:
-                    logger.warning(f"Error polling B2B order (attempt {attempt + 1}): {str(e)}")
-                    await asyncio.sleep(delay_seconds)
+                    status = response.status
+                    delay = min(max_delay_seconds, _retry_after_seconds(response.headers.get('Retry-After'), delay))
+
+                if status == 404:
+                    if is_last_attempt:
+                        raise Exception(f"B2B order {order_id} not found after {max_retries} attempts")
+                    logger.info("B2B order %s not found yet. Attempt %s of %s. Retrying in %.2f seconds...", order_id, attempt + 1, max_retries, delay)
                 else:
-                    logger.error(f"Failed to retrieve B2B order after {max_retries} attempts: {str(e)}")
+                    if is_last_attempt:
+                        raise Exception(f"B2B order {order_id} still unavailable (HTTP {status}) after {max_retries} attempts")
+                    logger.warning("B2B order %s poll returned HTTP %s. Attempt %s of %s. Retrying in %.2f seconds...", order_id, status, attempt + 1, max_retries, delay)
+
+            except aiohttp.ClientError as e:
+                if is_last_attempt:
+                    logger.error("Failed to retrieve B2B order after %s attempts: %s", max_retries, e)
                     raise
+                logger.warning("Error polling B2B order (attempt %s): %s", attempt + 1, e)
+
+            await asyncio.sleep(delay)
 
-    async def get_order_details(self, session: aiohttp.ClientSession, order_id: int) -> Dict[str, Any]:
+    async def get_order_details(self, order_id: int) -> Dict[str, Any]:
         """Get order details from v2 Orders API"""
-        try:
-            url = f"{self.bc_base_url}/v2/orders/{order_id}"
-            async with session.get(url, headers=self.bc_headers) as response:
-                response.raise_for_status()
-                order_data = await response.json()
-                logger.info(f"Successfully retrieved order {order_id} details")
-                return order_data
-                
-        except aiohttp.ClientError as e:
-            logger.error(f"Error retrieving order details: {str(e)}")
-            raise
+        url = f"{self.bc_base_url}/v2/orders/{order_id}"
+        order_data = await self._request(self.bc_session, 'GET', url, "Error retrieving order details")
+        logger.info("Successfully retrieved order %s details", order_id)
+        return order_data
 
-    async def create_b2b_order(self, session: aiohttp.ClientSession, order_id: int, customer_id: int) -> Dict[str, Any]:
+    async def create_b2b_order(self, order_id: int, customer_id: int) -> Dict[str, Any]:
         """Manually create a B2B order using the B2B Orders API"""
-        try:
-            url = f"{self.b2b_base_url}/orders"
-            payload = {
-                "bcOrderId": order_id,
-                "customerId": customer_id,
-                "extraFields": [
-                    {
-                        "fieldName": "Delivery Instructions",
-                        "fieldValue": "TBD"
-                    }
-                ]
-            }
-            
-            async with session.post(url, headers=self.b2b_headers, json=payload) as response:
-                response.raise_for_status()
-                b2b_order = await response.json()
-                logger.info(f"Successfully created B2B order for BC order {order_id}")
-                return b2b_order
-                
-        except aiohttp.ClientError as e:
-            logger.error(f"Error creating B2B order: {str(e)}")
-            raise
+        url = f"{self.b2b_base_url}/orders"
+        payload = {
+            "bcOrderId": order_id,
+            "customerId": customer_id,
+            "extraFields": [
+                {
+                    "fieldName": "Delivery Instructions",
+                    "fieldValue": "TBD"
+                }
+            ]
+        }
+        b2b_order = await self._request(self.b2b_session, 'POST', url, "Error creating B2B order", json=payload)
+        logger.info("Successfully created B2B order for BC order %s", order_id)
+        return b2b_order
 
     async def send_to_erp(self, b2b_order: Dict[str, Any]) -> Dict[str, Any]:
         """Simulate sending order data to ERP system and receiving a response"""
-        logger.info(f"Simulating sending order {b2b_order.get('id')} to ERP system")
+        logger.info("Simulating sending order %s to ERP system", b2b_order.get('id'))
         
         # Simulate processing delay
-        await asyncio.sleep(0.4)
+        if self.erp_delay > 0:
+            await asyncio.sleep(self.erp_delay)
         
         # Generate mock ERP response
         erp_response = {
@@ -355,90 +700,69 @@ class BCTestFlow:
             "extraField1": "ERP_PROCESSED"
         }
         
-        logger.info(f"Received mock ERP response for order {b2b_order.get('id')}")
+        logger.info("Received mock ERP response for order %s", b2b_order.get('id'))
         return erp_response
 
-    async def update_b2b_order(self, session: aiohttp.ClientSession, order_id: int, erp_response: Dict[str, Any]) -> Dict[str, Any]:
+    async def update_b2b_order(self, order_id: int, erp_response: Dict[str, Any], customer_id: int) -> Dict[str, Any]:
         """Update B2B order with ERP response data"""
-        try:
-            url = f"{self.b2b_base_url}/orders/{order_id}"
-            
-            # Prepare the update payload
-            payload = {
-                "bcOrderId": order_id,
-                "customerId": 19,  # Hardcoded as specified
-                "poNumber": erp_response["poNumber"],
-                "extraFields": [
-                    {
-                        "fieldName": "Delivery Instructions",
-                        "fieldValue": erp_response["extraField1"]
-                    }
-                ]
-            }
-            
-            async with session.put(url, headers=self.b2b_headers, json=payload) as response:
-                response.raise_for_status()
-                updated_order = await response.json()
-                logger.info(f"Successfully updated B2B order {order_id} with ERP data")
-                return updated_order
-                
-        except aiohttp.ClientError as e:
-            logger.error(f"Error updating B2B order: {str(e)}")
-            raise
+        url = f"{self.b2b_base_url}/orders/{order_id}"
+        
+        # Prepare the update payload
+        payload = {
+            "bcOrderId": order_id,
+            "customerId": customer_id,
+            "poNumber": erp_response["poNumber"],
+            "extraFields": [
+                {
+                    "fieldName": "Delivery Instructions",
+                    "fieldValue": erp_response["extraField1"]
+                }
+            ]
+        }
+        
+        updated_order = await self._request(self.b2b_session, 'PUT', url, "Error updating B2B order", json=payload)
+        logger.info("Successfully updated B2B order %s with ERP data", order_id)
+        return updated_order
 
-    async def verify_storefront_order(self, session: aiohttp.ClientSession, order_id: int) -> Dict[str, Any]:
+    async def verify_storefront_order(self, order_id: int) -> Dict[str, Any]:
         """Verify that the order is visible in the B2B Storefront GraphQL API"""
         try:
-            # Get the storefront token from environment
-            storefront_token = os.getenv('B2B_STOREFRONT_TOKEN')
-            if not storefront_token:
+            if not self.storefront_token:
                 raise ValueError("B2B_STOREFRONT_TOKEN environment variable is not set")
 
-            # Set up GraphQL endpoint and headers
+            # Set up GraphQL endpoint
             url = "https://api-b2b.bigcommerce.com/graphql"
-            headers = {
-                'Authorization': f'Bearer {storefront_token}',
-                'Content-Type': 'application/json',
-                'Accept': 'application/json'
-            }
-
-            # Construct the GraphQL query
-            query = """
-            query AllOrders($bcOrderId: Decimal!) {
-                allOrders(bcOrderId: $bcOrderId) {
-                    totalCount
-                    edges {
-                        cursor
-                        node {
-                            id
-                            createdAt
-                            updatedAt
-                            bcOrderId
-                            companyName
-                        }
-                    }
-                }
-            }
-            """
-            
-            # Set up the variables for the query
-            variables = {
-                "bcOrderId": order_id
-            }
-            
-            # Make the GraphQL request
-            payload = {
-                "query": query,
-                "variables": variables
-            }
+            body = ALL_ORDERS_BODY_TEMPLATE % order_id
             
-            async with session.post(url, headers=headers, json=payload) as response:
-                response.raise_for_status()
-                result = await response.json()
+            # Retry with backoff while the order hasn't reached the storefront yet, i.e.
+            # the query succeeds but returns no edges
+            for attempt in range(VERIFY_MAX_ATTEMPTS):
+                result = await self._request(
+                    self.sf_session, 'POST', url,
+                    "Error verifying order in B2B Storefront API", data=body
+                )
+                # Errors such as a bad token or query won't clear up by retrying
+                errors = result.get('errors')
+                if errors:
+                    logger.error("B2B Storefront API returned errors for order %s: %s", order_id, errors)
+                    return {
+                        "success": False,
+                        "message": "B2B Storefront API returned errors",
+                        "errors": errors,
+                        "data": None
+                    }
+                # GraphQL can return null data, so don't assume each level is a dict
+                edges = ((result.get('data') or {}).get('allOrders') or {}).get('edges')
+                if edges or attempt == VERIFY_MAX_ATTEMPTS - 1:
+                    break
+                delay = _backoff(attempt, POLL_INITIAL_DELAY, VERIFY_MAX_DELAY)
+                logger.info("Order %s not in B2B Storefront API yet. Attempt %s of %s. Retrying in %.2f seconds...",
+                            order_id, attempt + 1, VERIFY_MAX_ATTEMPTS, delay)
+                await asyncio.sleep(delay)
             
             # Check if we got any data
-            if not result.get('data', {}).get('allOrders', {}).get('edges'):
-                logger.warning(f"Order {order_id} not found in B2B Storefront API")
+            if not edges:
+                logger.warning("Order %s not found in B2B Storefront API", order_id)
                 return {
                     "success": False,
                     "message": "Order not found in B2B Storefront API",
@@ -446,7 +770,7 @@ class BCTestFlow:
                 }
             
             # Get the order data from the first edge
-            order_data = result['data']['allOrders']['edges'][0]['node']
+            order_data = edges[0]['node']
             
             # Verify the required fields
             verification_result = {
@@ -459,275 +783,457 @@ class BCTestFlow:
                 }
             }
             
-            logger.info(f"Successfully verified order {order_id} in B2B Storefront API")
-            logger.info(f"Verification details: {json.dumps(verification_result, indent=2)}")
+            logger.info("Successfully verified order %s in B2B Storefront API (company: %s)",
+                        order_id, order_data.get('companyName'))
+            # Serializing the result is the costliest log line, so only do it when debugging
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Verification details: %s", _orjson_dumps(verification_result))
             
             return verification_result
             
-        except aiohttp.ClientError as e:
-            logger.error(f"Error verifying order in B2B Storefront API: {str(e)}")
+        except aiohttp.ClientError:
+            # Already logged by _request
             raise
         except Exception as e:
-            logger.error(f"Unexpected error during storefront verification: {str(e)}")
+            logger.error("Unexpected error during storefront verification: %s", e)
             raise
 
+@dataclass(frozen=True)
+class OrderFlowConfig:
+    """Settings shared by every order flow in a run"""
+    b2b_order_mode: str = 'default'
+    max_retries: int = 9
+    retry_delay: int = 5
+    reports_dir: str = 'reports'
+    # Send the shipping option and billing updates together rather than one after the other
+    parallel_checkout: bool = True
+    # Append timing reports to one JSONL file per batch or date instead of a file per order
+    aggregate_reports: bool = False
+    # Wall-clock limit in seconds for each order's flow; 0 means no limit
+    order_timeout: float = 300
+
+    @classmethod
+    def from_args(cls, args: argparse.Namespace) -> 'OrderFlowConfig':
+        """Build the config from parsed command line arguments"""
+        return cls(
+            b2b_order_mode=args.b2b_order,
+            max_retries=args.max_retries,
+            retry_delay=args.retry_delay,
+            reports_dir=args.reports_dir,
+            parallel_checkout=not args.serial_checkout,
+            aggregate_reports=args.aggregate_reports,
+            order_timeout=args.order_timeout
+        )
+
+    def new_tracker(self, is_batch: bool = False, batch_start_time: Optional[datetime] = None) -> TimingTracker:
+        """Create a timing tracker that saves its report as configured"""
+        return TimingTracker(
+            reports_dir=self.reports_dir,
+            is_batch=is_batch,
+            batch_start_time=batch_start_time,
+            aggregate=self.aggregate_reports
+        )
+
+async def _run_order_steps(
+    test_flow: BCTestFlow,
+    timing: TimingTracker,
+    config: OrderFlowConfig,
+    order_prefix: str
+) -> int:
+    """Run the order flow's steps from cart to storefront verification, returning the order ID"""
+    # Create cart
+    timing.start_step('create_cart')
+    cart = await test_flow.create_cart()
+    cart_id = cart['id']
+    timing.end_step()
+
+    # Add shipping address and get shipping options
+    timing.start_step('add_shipping_address')
+    consignment_id, shipping_option_id, _ = await test_flow.add_shipping_address(cart)
+    timing.end_step()
+
+    # Update shipping option and add billing address; these touch independent
+    # parts of the checkout so the two requests can be in flight together
+    if config.parallel_checkout:
+        # Overlapping requests can't be timed apart, so they share one step
+        timing.start_step('update_shipping_and_billing')
+        await asyncio.gather(
+            test_flow.update_shipping_option(cart_id, consignment_id, shipping_option_id),
+            test_flow.add_billing_address(cart_id)
+        )
+        timing.end_step()
+    else:
+        # Sent one after the other, each keeps its own step so reports stay comparable with earlier runs
+        timing.start_step('update_shipping_option')
+        await test_flow.update_shipping_option(cart_id, consignment_id, shipping_option_id)
+        timing.end_step()
+
+        timing.start_step('add_billing_address')
+        await test_flow.add_billing_address(cart_id)
+        timing.end_step()
+
+    # Create order
+    timing.start_step('create_order')
+    order = await test_flow.create_order(cart_id)
+    order_id = order['id']
+    timing.order_id = order_id
+    timing.end_step()
+    logger.info("%sOrder created successfully with ID: %s", order_prefix, order_id)
+
+    # Update order status to Awaiting Fulfillment
+    timing.start_step('update_order_status')
+    updated_order = await test_flow.update_order_status(order_id)
+    timing.end_step()
+    logger.info("%sOrder %s status updated successfully", order_prefix, order_id)
+
+    # Handle ESL retrieval based on selected method
+    timing.start_step('esl_retrieval')
+    if config.b2b_order_mode == 'default':
+        logger.info("%sUsing default ESL retrieval method (manual B2B order creation)", order_prefix)
+        # The cart, order or v2 status update response carries the customer already (the
+        # PUT returns the full v2 order), so a separate v2 order lookup is only a last resort
+        customer_id = cart.get('customer_id') or order.get('customer_id') or updated_order.get('customer_id')
+        if customer_id is None:
+            order_details = await test_flow.get_order_details(order_id)
+            customer_id = order_details['customer_id']
+        b2b_order = await test_flow.create_b2b_order(order_id, customer_id)
+        logger.info("%sB2B order created successfully", order_prefix)
+    else:
+        logger.info("%sUsing alternative ESL retrieval method (polling)", order_prefix)
+        logger.info("%sPolling configuration: max_retries=%s, delay=%ss", order_prefix, config.max_retries, config.retry_delay)
+        b2b_order = await test_flow.poll_b2b_order(
+            order_id,
+            max_retries=config.max_retries,
+            max_delay_seconds=config.retry_delay
+        )
+        logger.info("%sB2B order %s retrieved successfully", order_prefix, order_id)
+        # The B2B order lookup returns the company, not the customer, so take the
+        # customer from the cart the order was placed from
+        customer_id = cart['customer_id']
+    timing.end_step()
+
+    # Send order to ERP
+    timing.start_step('erp_processing')
+    logger.info("%sStarting ERP simulation for order %s", order_prefix, order_id)
+    erp_response = await test_flow.send_to_erp(b2b_order)
+    logger.info("%sERP simulation completed for order %s", order_prefix, order_id)
+    logger.info("%sERP response: %s", order_prefix, erp_response)
+    timing.end_step()
+
+    # Update B2B order with ERP response data
+    timing.start_step('update_b2b_order')
+    logger.info("%sUpdating B2B order %s with ERP data", order_prefix, order_id)
+    updated_b2b_order = await test_flow.update_b2b_order(order_id, erp_response, customer_id)
+    logger.info("%sB2B order %s updated successfully with ERP data", order_prefix, order_id)
+    timing.end_step()
+
+    # Verify storefront order
+    timing.start_step('storefront_verification')
+    verification_result = await test_flow.verify_storefront_order(order_id)
+    logger.info("%sStorefront verification result: %s", order_prefix, verification_result)
+    timing.end_step()
+
+    return order_id
+
 async def process_single_order(
     test_flow: BCTestFlow,
     timing: TimingTracker,
-    b2b_order_mode: str,
-    max_retries: int,
-    retry_delay: int,
-    reports_dir: str,
+    config: OrderFlowConfig,
     order_number: Optional[int] = None
 ) -> Dict[str, Any]:
     """Process a single order through the complete flow"""
     order_prefix = f"Order {order_number}: " if order_number is not None else ""
+    _current_timing.set(timing)
     
     try:
-        async with aiohttp.ClientSession() as session:
-            # Create cart
-            timing.start_step('create_cart')
-            cart = await test_flow.create_cart(session)
-            cart_id = cart['id']
-            timing.end_step()
-            
-            # Add shipping address and get shipping options
-            timing.start_step('add_shipping_address')
-            consignment_data = await test_flow.add_shipping_address(session, cart_id)
-            consignment_id = consignment_data['consignments'][0]['id']
-            timing.end_step()
-            
-            # Get the first available shipping option
-            shipping_option_id = consignment_data['consignments'][0]['available_shipping_options'][0]['id']
-            
-            # Update shipping option
-            timing.start_step('update_shipping_option')
-            await test_flow.update_shipping_option(session, cart_id, consignment_id, shipping_option_id)
-            timing.end_step()
-            
-            # Add billing address
-            timing.start_step('add_billing_address')
-            await test_flow.add_billing_address(session, cart_id)
-            timing.end_step()
-            
-            # Create order
-            timing.start_step('create_order')
-            order = await test_flow.create_order(session, cart_id)
-            order_id = order['id']
-            timing.order_id = order_id
-            timing.end_step()
-            logger.info(f"{order_prefix}Order created successfully with ID: {order_id}")
-            
-            # Update order status to Awaiting Fulfillment
-            timing.start_step('update_order_status')
-            updated_order = await test_flow.update_order_status(session, order_id)
-            timing.end_step()
-            logger.info(f"{order_prefix}Order {order_id} status updated successfully")
-            
-            # Handle ESL retrieval based on selected method
-            timing.start_step('esl_retrieval')
-            if b2b_order_mode == 'default':
-                logger.info(f"{order_prefix}Using default ESL retrieval method (manual B2B order creation)")
-                order_details = await test_flow.get_order_details(session, order_id)
-                customer_id = order_details['customer_id']
-                b2b_order = await test_flow.create_b2b_order(session, order_id, customer_id)
-                logger.info(f"{order_prefix}B2B order created successfully")
-            else:
-                logger.info(f"{order_prefix}Using alternative ESL retrieval method (polling)")
-                logger.info(f"{order_prefix}Polling configuration: max_retries={max_retries}, delay={retry_delay}s")
-                b2b_order = await test_flow.poll_b2b_order(
-                    session,
-                    order_id,
-                    max_retries=max_retries,
-                    delay_seconds=retry_delay
-                )
-                logger.info(f"{order_prefix}B2B order {order_id} retrieved successfully")
-            timing.end_step()
-            
-            # Send order to ERP
-            timing.start_step('erp_processing')
-            logger.info(f"{order_prefix}Starting ERP simulation for order {order_id}")
-            erp_response = await test_flow.send_to_erp(b2b_order)
-            logger.info(f"{order_prefix}ERP simulation completed for order {order_id}")
-            logger.info(f"{order_prefix}ERP response: {erp_response}")
-            timing.end_step()
-            
-            # Update B2B order with ERP response data
-            timing.start_step('update_b2b_order')
-            logger.info(f"{order_prefix}Updating B2B order {order_id} with ERP data")
-            updated_b2b_order = await test_flow.update_b2b_order(session, order_id, erp_response)
-            logger.info(f"{order_prefix}B2B order {order_id} updated successfully with ERP data")
-            timing.end_step()
-            
-            # Verify storefront order
-            timing.start_step('storefront_verification')
-            verification_result = await test_flow.verify_storefront_order(session, order_id)
-            logger.info(f"{order_prefix}Storefront verification result: {verification_result}")
-            timing.end_step()
-            
-            # End flow timing
-            timing.end_flow()
-            
-            logger.info(f"{order_prefix}Checkout process completed successfully")
-            return {
-                'success': True,
-                'order_id': order_id,
-                'summary': timing.steps
-            }
-            
+        # Bound the whole flow so a stuck order gives up its concurrency slot
+        order_id = await asyncio.wait_for(
+            _run_order_steps(test_flow, timing, config, order_prefix),
+            config.order_timeout or None
+        )
+        
+        # End flow timing
+        await timing.end_flow()
+        
+        logger.info("%sCheckout process completed successfully (%s API requests)", order_prefix, timing.request_count)
+        return {
+            'success': True,
+            'order_number': order_number,
+            'order_id': order_id,
+            'summary': timing.steps
+        }
+        
     except Exception as e:
-        logger.error(f"{order_prefix}Error in checkout process: {str(e)}")
+        # A failed order is recorded in its own result rather than raised, so the
+        # rest of a batch carries on and the batch summary still counts it
+        failed_step = timing.current_step
+        # aiohttp's socket timeouts are also asyncio.TimeoutErrors; only wait_for's means the order ran out of time
+        if isinstance(e, asyncio.TimeoutError) and not isinstance(e, aiohttp.ServerTimeoutError):
+            logger.error("%sOrder timed out after %ss during %s", order_prefix, config.order_timeout, failed_step)
+            error = f"timed out after {config.order_timeout}s"
+        else:
+            logger.error("%sError in checkout process during %s: %s", order_prefix, failed_step, e)
+            error = str(e)
         return {
             'success': False,
-            'error': str(e)
+            'order_number': order_number,
+            'failed_step': failed_step,
+            'error': error
         }
 
+async def process_order(
+    test_flow: BCTestFlow,
+    config: OrderFlowConfig
+) -> Dict[str, Any]:
+    """Process a single order"""
+    timing = config.new_tracker()
+    timing.start_flow()
+    return await process_single_order(
+        test_flow,
+        timing,
+        config
+    )
+
 async def process_orders_sequential(
+    test_flow: BCTestFlow,
     num_orders: int,
     delay_seconds: int,
-    b2b_order_mode: str,
-    max_retries: int,
-    retry_delay: int,
-    reports_dir: str
-) -> List[Dict[str, Any]]:
-    """Process multiple orders sequentially with a delay between each order"""
-    test_flow = BCTestFlow()
-    results = []
-    batch_tracker = TimingTracker(is_batch=True)
+    config: OrderFlowConfig
+) -> Tuple[List[Dict[str, Any]], int]:
+    """Process multiple orders sequentially with a delay between each order, returning the results and success count"""
+    results: List[Optional[Dict[str, Any]]] = [None] * num_orders
+    successful = 0
+    batch_tracker = config.new_tracker(is_batch=True)
     batch_tracker.start_flow()
     
     for i in range(num_orders):
-        timing = TimingTracker(is_batch=True, batch_start_time=batch_tracker.start_time)
+        timing = config.new_tracker(is_batch=True, batch_start_time=batch_tracker.start_time)
         timing.start_flow(order_number=i + 1)
         
-        result = await process_single_order(
+        result = results[i] = await process_single_order(
             test_flow,
             timing,
-            b2b_order_mode,
-            max_retries,
-            retry_delay,
-            reports_dir,
+            config,
             order_number=i + 1
         )
-        results.append(result)
+        successful += result['success']
         
         if i < num_orders - 1:  # Don't delay after the last order
-            logger.info(f"Waiting {delay_seconds} seconds before next order...")
+            logger.info("Waiting %s seconds before next order...", delay_seconds)
             await asyncio.sleep(delay_seconds)
     
-    batch_tracker.end_flow()
-    return results
+    await batch_tracker.end_flow()
+    return results, successful
 
-async def process_orders_concurrent(
-    num_orders: int,
-    max_concurrent: int,
-    b2b_order_mode: str,
-    max_retries: int,
-    retry_delay: int,
-    reports_dir: str
-) -> List[Dict[str, Any]]:
-    """Process multiple orders concurrently with a maximum number of concurrent orders"""
-    test_flow = BCTestFlow()
-    results = []
-    
-    # Create a semaphore to limit concurrent orders
-    semaphore = asyncio.Semaphore(max_concurrent)
-    batch_tracker = TimingTracker(is_batch=True)
-    batch_tracker.start_flow()
-    
-    async def process_with_semaphore(order_number: int):
-        async with semaphore:
-            timing = TimingTracker(is_batch=True, batch_start_time=batch_tracker.start_time)
-            timing.start_flow(order_number=order_number)
-            return await process_single_order(
-                test_flow,
+class _OverlappedBatch:
+    """Results, counters and per-order task body shared by the modes that run orders side by side
+
+    The modes differ only in how they launch orders: each takes a slot from slots
+    before starting run_order(index) as a task, and the task gives it back when done.
+    """
+
+    def __init__(self, test_flow: BCTestFlow, num_orders: int, slots: SlotController, config: OrderFlowConfig):
+        self.test_flow = test_flow
+        self.num_orders = num_orders
+        self.slots = slots
+        self.config = config
+        # Each order stores its result in its own slot and counts itself as soon as it finishes
+        self.results: List[Optional[Dict[str, Any]]] = [None] * num_orders
+        self.successful = 0
+        # Orders finish out of order, so progress is logged as each one completes
+        self.completed = 0
+        self.tracker = config.new_tracker(is_batch=True)
+        self.tracker.start_flow()
+
+    async def run_order(self, index: int):
+        """Process one order of the batch, record its result and release its slot"""
+        try:
+            timing = self.config.new_tracker(is_batch=True, batch_start_time=self.tracker.start_time)
+            timing.start_flow(order_number=index + 1)
+            result = self.results[index] = await process_single_order(
+                self.test_flow,
                 timing,
-                b2b_order_mode,
-                max_retries,
-                retry_delay,
-                reports_dir,
-                order_number=order_number
+                self.config,
+                order_number=index + 1
             )
-    
-    # Create tasks for all orders
-    tasks = [
-        process_with_semaphore(i + 1)
-        for i in range(num_orders)
-    ]
-    
-    # Wait for all tasks to complete
-    results = await asyncio.gather(*tasks)
-    batch_tracker.end_flow()
-    return results
+            self.successful += result['success']
+            self.completed += 1
+            logger.info("[%s/%s] Order %s %s", self.completed, self.num_orders, index + 1,
+                        'OK' if result['success'] else 'FAILED')
+        finally:
+            await self.slots.release()
+
+    async def finish(self, tasks) -> Tuple[List[Dict[str, Any]], int]:
+        """Wait for the launched orders, save the batch timing, and return the results and success count"""
+        await asyncio.gather(*tasks)
+        await self.tracker.end_flow()
+        return self.results, self.successful
+
+async def process_orders_pipelined(
+    test_flow: BCTestFlow,
+    num_orders: int,
+    delay_seconds: int,
+    slots: SlotController,
+    config: OrderFlowConfig
+) -> Tuple[List[Dict[str, Any]], int]:
+    """Start a new order every delay_seconds without waiting for the previous one to finish
+
+    Returns the results and success count. Keeps the sequential mode's steady order
+    rate, but an order that is still polling no longer holds back the next one. At
+    most slots.limit orders are in flight; when that many are running, the next
+    start waits for one to finish.
+    """
+    batch = _OverlappedBatch(test_flow, num_orders, slots, config)
+    tasks = []
+    for i in range(num_orders):
+        # Pace before taking a slot, never while holding one, so a finished
+        # order's slot is free for the next start as soon as the interval ends
+        if i > 0:  # Don't delay before the first order
+            logger.info("Waiting %s seconds before starting next order...", delay_seconds)
+            await asyncio.sleep(delay_seconds)
+        await slots.acquire()
+        tasks.append(asyncio.create_task(batch.run_order(i)))
+    return await batch.finish(tasks)
+
+async def process_orders_concurrent(
+    test_flow: BCTestFlow,
+    num_orders: int,
+    slots: SlotController,
+    config: OrderFlowConfig
+) -> Tuple[List[Dict[str, Any]], int]:
+    """Process multiple orders concurrently, at most slots.limit at a time, returning the results and success count"""
+    batch = _OverlappedBatch(test_flow, num_orders, slots, config)
+    # Take a slot before creating each order's task, so only slots.limit tasks
+    # exist at once however many orders are requested; finished tasks drop out of
+    # the pending set as they complete
+    pending = set()
+    for i in range(num_orders):
+        await slots.acquire()
+        task = asyncio.create_task(batch.run_order(i))
+        pending.add(task)
+        task.add_done_callback(pending.discard)
+    return await batch.finish(pending)
+
+def _log_batch_summary(num_orders: int, successful: int):
+    """Log how many orders in a batch succeeded and failed"""
+    logger.info("Completed %s orders: %s successful, %s failed", num_orders, successful, num_orders - successful)
+
+async def _run_single(test_flow: BCTestFlow, args: argparse.Namespace, config: OrderFlowConfig, slots: SlotController):
+    """Process a single order"""
+    await process_order(test_flow, config)
+
+async def _run_sequential(test_flow: BCTestFlow, args: argparse.Namespace, config: OrderFlowConfig, slots: SlotController):
+    """Process orders one after another"""
+    logger.info("Processing %s orders sequentially with %ss delay", args.num_orders, args.delay)
+    _, successful = await process_orders_sequential(test_flow, args.num_orders, args.delay, config)
+    _log_batch_summary(args.num_orders, successful)
+
+async def _run_pipelined(test_flow: BCTestFlow, args: argparse.Namespace, config: OrderFlowConfig, slots: SlotController):
+    """Start orders at a steady rate, overlapping their flows"""
+    logger.info("Processing %s orders, starting one every %ss (max %s at a time)",
+                args.num_orders, args.delay, slots.limit)
+    _, successful = await process_orders_pipelined(test_flow, args.num_orders, args.delay, slots, config)
+    _log_batch_summary(args.num_orders, successful)
+
+async def _run_concurrent(test_flow: BCTestFlow, args: argparse.Namespace, config: OrderFlowConfig, slots: SlotController):
+    """Process orders concurrently"""
+    logger.info("Processing %s orders concurrently (max %s at a time)", args.num_orders, slots.limit)
+    _, successful = await process_orders_concurrent(test_flow, args.num_orders, slots, config)
+    _log_batch_summary(args.num_orders, successful)
+
+# Processing modes selectable with --mode; each runner logs its own preamble and summary
+MODES: Dict[str, Callable[[BCTestFlow, argparse.Namespace, OrderFlowConfig, SlotController], Awaitable[None]]] = {
+    'single': _run_single,
+    'sequential': _run_sequential,
+    'pipelined': _run_pipelined,
+    'concurrent': _run_concurrent,
+}
+
+async def run(args: argparse.Namespace):
+    """Run the selected processing mode on one event loop with one shared BCTestFlow"""
+    # The flow's sessions are closed when the block exits, after reports are flushed
+    async with BCTestFlow(
+        erp_delay=args.erp_delay,
+        max_concurrent=args.max_concurrent,
+        poll_backoff_factor=args.backoff_factor
+    ) as test_flow:
+        await test_flow.preload_test_data()
+        # Reports are written in the background and flushed before run() returns
+        report_writer = ReportWriter()
+        report_writer.start()
+        TimingTracker.report_writer = report_writer
+        # SIGUSR1 and SIGUSR2 raise and lower the concurrent order cap by one while a batch is running
+        slots = SlotController(args.max_concurrent)
+        loop = asyncio.get_running_loop()
+        resize_signals = {}
+        if hasattr(signal, 'SIGUSR1'):
+            resize_signals = {signal.SIGUSR1: 1, signal.SIGUSR2: -1}
+        resize_tasks = set()
+        def resize(step: int):
+            task = asyncio.create_task(slots.set_limit(slots.limit + step))
+            resize_tasks.add(task)
+            task.add_done_callback(resize_tasks.discard)
+        for signum, step in resize_signals.items():
+            loop.add_signal_handler(signum, resize, step)
+        config = OrderFlowConfig.from_args(args)
+        try:
+            await MODES[args.mode](test_flow, args, config, slots)
+        finally:
+            for signum in resize_signals:
+                loop.remove_signal_handler(signum)
+            await report_writer.close()
+            TimingTracker.report_writer = None
+
+def _use_uvloop():
+    """Run asyncio on uvloop when it's installed; it's an optional speed-up and isn't available on Windows"""
+    if sys.platform == 'win32':
+        return
+    try:
+        import uvloop
+    except ImportError:
+        return
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    logger.debug("Using uvloop event loop")
 
 def main():
     # Set up argument parser
     parser = argparse.ArgumentParser(description='Test BigCommerce API flow')
     parser.add_argument('--b2b-order', choices=['default', 'alt'], default='default',
                       help='ESL retrieval method: default (manual B2B order creation) or alt (polling)')
-    parser.add_argument('--max-retries', type=int, default=6,
-                      help='Maximum number of retry attempts for B2B order polling (default: 6)')
+    parser.add_argument('--max-retries', type=int, default=9,
+                      help='Maximum number of retry attempts for B2B order polling (default: 9)')
     parser.add_argument('--retry-delay', type=int, default=5,
-                      help='Delay between retries in seconds for B2B order polling (default: 5)')
+                      help='Maximum delay between retries in seconds for B2B order polling; retries start at 0.5s and grow by --backoff-factor up to this value (default: 5)')
+    parser.add_argument('--backoff-factor', type=float, default=2.0,
+                      help='Multiplier applied to the B2B order polling delay after each attempt (default: 2)')
+    parser.add_argument('--order-timeout', type=float, default=300,
+                      help='Give up on an order whose flow takes longer than this many seconds; 0 disables it (default: 300)')
+    parser.add_argument('--erp-delay', type=float, default=0.4,
+                      help='Simulated ERP processing time in seconds; 0 disables it (default: 0.4)')
+    parser.add_argument('--serial-checkout', action='store_true',
+                      help='Send the shipping option and billing address one after the other instead of together')
     parser.add_argument('--reports-dir', type=str, default='reports',
                       help='Directory to store timing reports (default: reports)')
+    parser.add_argument('--aggregate-reports', action='store_true',
+                      help='Append timing reports to one JSONL file per batch or date instead of writing a file per order')
     
     # Add new arguments for multiple order processing
     parser.add_argument('--num-orders', type=int, default=1,
                       help='Number of orders to process (default: 1)')
-    parser.add_argument('--mode', choices=['single', 'sequential', 'concurrent'], default='single',
+    parser.add_argument('--mode', choices=list(MODES), default='single',
                       help='Order processing mode (default: single)')
     parser.add_argument('--delay', type=int, default=5,
-                      help='Delay between orders in seconds for sequential mode (default: 5)')
+                      help='Delay between orders in seconds for sequential and pipelined modes (default: 5)')
     parser.add_argument('--max-concurrent', type=int, default=3,
-                      help='Maximum number of concurrent orders for concurrent mode (default: 3)')
+                      help='Maximum number of concurrent orders for concurrent and pipelined modes (default: 3)')
     
     args = parser.parse_args()
 
+    _use_uvloop()
     try:
-        if args.mode == 'single':
-            # Process a single order
-            timing = TimingTracker()
-            timing.start_flow()
-            asyncio.run(process_single_order(
-                BCTestFlow(),
-                timing,
-                args.b2b_order,
-                args.max_retries,
-                args.retry_delay,
-                args.reports_dir
-            ))
-        elif args.mode == 'sequential':
-            # Process orders sequentially
-            logger.info(f"Processing {args.num_orders} orders sequentially with {args.delay}s delay")
-            results = asyncio.run(process_orders_sequential(
-                args.num_orders,
-                args.delay,
-                args.b2b_order,
-                args.max_retries,
-                args.retry_delay,
-                args.reports_dir
-            ))
-            # Log summary of results
-            successful = sum(1 for r in results if r['success'])
-            logger.info(f"Completed {len(results)} orders: {successful} successful, {len(results) - successful} failed")
-        else:  # concurrent mode
-            # Process orders concurrently
-            logger.info(f"Processing {args.num_orders} orders concurrently (max {args.max_concurrent} at a time)")
-            results = asyncio.run(process_orders_concurrent(
-                args.num_orders,
-                args.max_concurrent,
-                args.b2b_order,
-                args.max_retries,
-                args.retry_delay,
-                args.reports_dir
-            ))
-            # Log summary of results
-            successful = sum(1 for r in results if r['success'])
-            logger.info(f"Completed {len(results)} orders: {successful} successful, {len(results) - successful} failed")
-            
+        asyncio.run(run(args))
     except Exception as e:
-        logger.error(f"Error in main process: {str(e)}")
+        logger.error("Error in main process: %s", e)
         raise
 
 if __name__ == "__main__":
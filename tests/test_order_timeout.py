@@ -0,0 +1,107 @@
+"""Regression tests for the per-order timeout, run against a local mock of the BC and B2B APIs"""
+import asyncio
+import os
+import tempfile
+import time
+import unittest
+
+from aiohttp import web
+
+os.environ.setdefault('BC_STORE_HASH', 'test')
+os.environ.setdefault('BC_ACCESS_TOKEN', 'test')
+os.environ.setdefault('B2B_ACCESS_TOKEN', 'test')
+
+import test_flow
+
+CART = {"id": "cart-1", "line_items": {"physical_items": [{"id": "item-1"}]}}
+CONSIGNMENTS = {"id": "cart-1", "consignments": [{"id": "cons-1", "available_shipping_options": [{"id": "ship-1"}]}]}
+
+class MockAPI:
+    """BC endpoints that always succeed and a B2B order lookup that never finds the order"""
+
+    def __init__(self):
+        self.next_order_id = 101
+        # (monotonic time, order ID) of each B2B order poll, and the time each cart was created
+        self.polls = []
+        self.cart_times = []
+        self.app = web.Application()
+        self.app.router.add_post('/stores/test/v3/carts', self.create_cart)
+        self.app.router.add_post('/stores/test/v3/checkouts/{cart_id}/consignments', self.consignments)
+        self.app.router.add_put('/stores/test/v3/checkouts/{cart_id}/consignments/{consignment_id}', self.checkout)
+        self.app.router.add_post('/stores/test/v3/checkouts/{cart_id}/billing-address', self.checkout)
+        self.app.router.add_post('/stores/test/v3/checkouts/{cart_id}/orders', self.create_order)
+        self.app.router.add_put('/stores/test/v2/orders/{order_id}', self.update_order)
+        self.app.router.add_get('/b2b/orders/{order_id}', self.get_b2b_order)
+
+    async def create_cart(self, request):
+        self.cart_times.append(time.monotonic())
+        return web.json_response({"data": CART})
+
+    async def consignments(self, request):
+        return web.json_response({"data": CONSIGNMENTS})
+
+    async def checkout(self, request):
+        return web.json_response({"data": {"id": "cart-1"}})
+
+    async def create_order(self, request):
+        order_id = self.next_order_id
+        self.next_order_id += 1
+        return web.json_response({"data": {"id": order_id}})
+
+    async def update_order(self, request):
+        return web.json_response({"id": int(request.match_info['order_id']), "customer_id": 1})
+
+    async def get_b2b_order(self, request):
+        self.polls.append((time.monotonic(), int(request.match_info['order_id'])))
+        return web.json_response({"code": 404, "message": "not found"}, status=404)
+
+class OrderTimeoutTest(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.api = MockAPI()
+        self.runner = web.AppRunner(self.api.app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, '127.0.0.1', 0)
+        await site.start()
+        port = self.runner.addresses[0][1]
+
+        self.reports_dir = tempfile.TemporaryDirectory()
+        self.test_flow = test_flow.BCTestFlow(erp_delay=0)
+        self.test_flow.bc_base_url = f"http://127.0.0.1:{port}/stores/test"
+        self.test_flow.b2b_base_url = f"http://127.0.0.1:{port}/b2b"
+
+    async def asyncTearDown(self):
+        await self.test_flow.close()
+        await self.runner.cleanup()
+        self.reports_dir.cleanup()
+
+    async def test_timed_out_order_stops_polling(self):
+        config = test_flow.OrderFlowConfig(
+            b2b_order_mode='alt',
+            max_retries=50,
+            retry_delay=1,
+            reports_dir=self.reports_dir.name,
+            order_timeout=1.5
+        )
+        results, successful = await test_flow.process_orders_concurrent(
+            self.test_flow, 2, test_flow.SlotController(1), config
+        )
+
+        self.assertEqual(successful, 0)
+        for result in results:
+            self.assertEqual(result['failed_step'], 'esl_retrieval')
+            self.assertIn('timed out', result['error'])
+
+        # With one slot, the second order only starts once the first has timed out,
+        # so none of the first order's polls may come after that
+        first_order_polls = [at for at, order_id in self.api.polls if order_id == 101]
+        self.assertTrue(first_order_polls)
+        self.assertLess(max(first_order_polls), self.api.cart_times[1])
+
+        # Nothing keeps polling in the background once the batch is done
+        polls_at_finish = len(self.api.polls)
+        await asyncio.sleep(1.5)
+        self.assertEqual(len(self.api.polls), polls_at_finish)
+
+if __name__ == '__main__':
+    unittest.main()